@@ -4,13 +4,13 @@
 #  Authors: Oliver Bruendler
 ##############################################################################
 
-from VhdlParse import VhdlFile, VhdlPortDeclaration
+from VhdlParse import VhdlFile, VhdlPortDeclaration, VhdlSource
 import pyparsing as pp
-from typing import Iterable, List
+import os
+from typing import Iterable, List, Union, IO
 from PsiPyUtils import FileWriter
 from UtilFunc import VhdlTitle
-
-class UnknownVhdlType(Exception): pass
+from TypeResolver import TypeResolver, ResolvedType, TypeKind, UnknownVhdlType
 
 #Tags in the form $$ BLA=5; BLUBB=1,2,3 $$
 class Tags:
@@ -30,13 +30,24 @@ class Tags:
     TESTCASES = "testcases"
     DUTLIB = "dutlib"
     TBPKG = "tbpkg"
+    TIMINGREPORT = "timingreport"
+    TIMEOUT = "timeout"
+    TIMEOUTCLK = "timeoutclk"
 
 class DutInfo:
 
-    def __init__(self, filePath : str):
-        self.parseInfo = VhdlFile(filePath)
+    #searchPath lists the directories searched for packages the DUT uses, the directory of the DUT file is always searched
+    def __init__(self, source : Union[str, bytes, os.PathLike, IO, VhdlSource], sourceName : str = None, searchPath : Iterable[str] = None):
+        self.parseInfo = VhdlFile(source, sourceName)
         self.name = self.parseInfo.entity.name
 
+        #resolver for types declared in packages
+        searchPath = list(searchPath) if searchPath is not None else []
+        if self.parseInfo.filePath is not None:
+            searchPath.insert(0, os.path.dirname(self.parseInfo.filePath))
+        self.typeResolver = TypeResolver(searchPath)
+        self._resolvedTypes = {}
+
         # sort use-statements according to library
         self.libraries = {}
         for s in self.parseInfo.usestatements:
@@ -46,9 +57,24 @@ class DutInfo:
 
         #parse file scope tags
         self.fileScopeTags = {}
+        self.fileScopeTagLines = {}
         for c in self.parseInfo.commentLines:
             tags = self._ParseTags(c.comment)
             self.fileScopeTags.update(tags)
+            self.fileScopeTagLines.update({t : c.lineNr for t in tags})
+
+        #resolve all types before any output is written, ports that cannot be resolved keep their VHDL default
+        self.typeWarnings = []
+        for obj in self.generics + self.ports:
+            try:
+                self.ResolveType(obj)
+            except UnknownVhdlType as e:
+                if obj in self.ports:
+                    self.typeWarnings.append("{}:{}: {}, port {} keeps its VHDL default".format(self.fileName, obj.lineNr, e, obj.name))
+
+    @property
+    def fileName(self):
+        return self.parseInfo.fileName
 
     @property
     def generics(self):
@@ -65,18 +91,33 @@ class DutInfo:
         else:
             return "work"
 
+    #Resolves the type of a port or generic, types from packages are looked up through the use statements of the DUT
+    #Raises UnknownVhdlType if the type cannot be resolved, including errors reading or parsing package files
+    def ResolveType(self, obj) -> ResolvedType:
+        if obj.name not in self._resolvedTypes:
+            packages = TypeResolver.UsedPackages(self.parseInfo.usestatements)
+            try:
+                self._resolvedTypes[obj.name] = self.typeResolver.Resolve(obj.type, packages)
+            except UnknownVhdlType as e:
+                self._resolvedTypes[obj.name] = e
+            except Exception as e:
+                self._resolvedTypes[obj.name] = UnknownVhdlType("Type {} could not be resolved ({})".format(obj.type.name, e))
+        resolved = self._resolvedTypes[obj.name]
+        if isinstance(resolved, UnknownVhdlType):
+            raise resolved
+        return resolved
+
     def GetPortValue(self, port : VhdlPortDeclaration, active : bool):
         #Find initial value
         if DutInfo.HastTagValue(port, Tags.LOWACTIVE, "true"):
             initVal = "'0'" if active else "'1'"
         else:
             initVal = "'1'" if active else "'0'"
-        if port.type.name == "std_logic":
-            return initVal
-        elif port.type.name == "std_logic_vector":
-            return "(others => {})".format(initVal)
-        else:
-            raise UnknownVhdlType("Unknown VHDL Type {}".format(port.type.name))
+        portType = self.ResolveType(port)
+        #Scalars other than std_logic keep their VHDL default
+        if portType.kind not in [TypeKind.LOGIC, TypeKind.LOGIC_VECTOR, TypeKind.RECORD, TypeKind.ARRAY]:
+            raise UnknownVhdlType("No initial value for VHDL Type {}".format(port.type.name))
+        return portType.Value(initVal)
 
 
     def LibraryDeclarations(self, f : FileWriter) -> FileWriter:
@@ -71,7 +71,7 @@ def WriteCasePkg(path : str, dutInfo : DutInfo, tbInfo : TbInfo, case : str, ext
             f.WriteLn("procedure {} (".format(p)).IncIndent()
             for s in tbInfo.GetPortsForProcess(p):
                 procDir = PortDirectionForProcedure(p, s)
-                f.WriteLn("signal {} : {} {};".format(s.name, procDir, s.type.name))
+                f.WriteLn("signal {} : {} {};".format(s.name, procDir, s.type.ParameterType()))
             f.WriteLn("constant Generics_c : Generics_t);")
             f.WriteLn().DecIndent()
         f.DecIndent().WriteLn("end package;")
@@ -82,7 +82,7 @@ def WriteCasePkg(path : str, dutInfo : DutInfo, tbInfo : TbInfo, case : str, ext
             f.WriteLn("procedure {} (".format(p)).IncIndent()
             for s in tbInfo.GetPortsForProcess(p):
                 procDir = PortDirectionForProcedure(p, s)
-                f.WriteLn("signal {} : {} {};".format(s.name, procDir, s.type.name))
+                f.WriteLn("signal {} : {} {};".format(s.name, procDir, s.type.ParameterType()))
             f.WriteLn("constant Generics_c : Generics_t) is").DecIndent()
             f.WriteLn("begin").IncIndent()
             f.WriteLn("assert false report \"Case {} Procedure {}: No Content added yet!\" severity warning;".format(case.upper(), p.upper()))
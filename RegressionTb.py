@@ -0,0 +1,120 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+from PsiPyUtils import FileWriter
+from DutInfo import DutInfo, Tags
+from TbInfo import TbInfo, CheckTbNames
+from UtilFunc import VhdlTitle, CopyrightNotice
+from typing import List
+
+def CheckRegression(tbInfos : List[TbInfo], groupSize : int = 1):
+    if groupSize < 1:
+        raise Exception("Regression group size must be at least 1!")
+    CheckTbNames(tbInfos)
+    for tb in tbInfos:
+        for g in DutInfo.FilterForTag(tb.dutInfo.generics, Tags.EXPORT, "true"):
+            if g.default is None:
+                raise Exception("Testbench {} cannot be added to the regression, exported generic {} has no default value!".format(tb.tbName, g.name))
+
+def WriteRegressionPkg(path : str, name : str, tbInfos : List[TbInfo], groupSize : int, extension : str = ".vhd", overwrite : bool = False):
+    pkgName = name + "_pkg"
+    with FileWriter(path + "/" + pkgName + extension, overwrite=overwrite) as f:
+        CopyrightNotice(f)
+        VhdlTitle("Package Header", f)
+        f.WriteLn("package {} is".format(pkgName)).IncIndent()
+        f.WriteLn()
+        f.WriteLn("constant TbCount_c : integer := {};".format(len(tbInfos)))
+        f.WriteLn("constant GroupSize_c : integer := {};".format(groupSize))
+        f.WriteLn()
+        f.WriteLn("procedure TbMonitor(TbName : string;").IncIndent()
+        f.WriteLn("signal TbStart : in boolean;")
+        f.WriteLn("signal TbDone : in boolean;")
+        f.WriteLn("signal TbTimedOut : in boolean);").DecIndent()
+        f.WriteLn()
+        f.DecIndent().WriteLn("end package;")
+        f.WriteLn()
+        VhdlTitle("Package Body", f)
+        f.WriteLn("package body {} is".format(pkgName)).IncIndent()
+        f.WriteLn()
+        f.WriteLn("procedure TbMonitor(TbName : string;").IncIndent()
+        f.WriteLn("signal TbStart : in boolean;")
+        f.WriteLn("signal TbDone : in boolean;")
+        f.WriteLn("signal TbTimedOut : in boolean) is")
+        f.WriteLn("variable Start_v : time;").DecIndent()
+        f.WriteLn("begin").IncIndent()
+        f.WriteLn("if not TbStart then").IncIndent()
+        f.WriteLn("wait until TbStart;")
+        f.DecIndent().WriteLn("end if;")
+        f.WriteLn("Start_v := now;")
+        f.WriteLn("report \"Testbench \" & TbName & \" started\" severity note;")
+        f.WriteLn("if not TbDone then").IncIndent()
+        f.WriteLn("wait until TbDone;")
+        f.DecIndent().WriteLn("end if;")
+        f.WriteLn("if TbTimedOut then").IncIndent()
+        f.WriteLn("report \"Testbench \" & TbName & \" TIMED OUT after \" & time'image(now - Start_v) severity error;")
+        f.DecIndent().WriteLn("else").IncIndent()
+        f.WriteLn("report \"Testbench \" & TbName & \" passed after \" & time'image(now - Start_v) severity note;")
+        f.DecIndent().WriteLn("end if;")
+        f.WriteLn("wait;")
+        f.DecIndent().WriteLn("end procedure;")
+        f.WriteLn()
+        f.DecIndent().WriteLn("end;")
+
+def WriteRegressionTb(path : str, name : str, tbInfos : List[TbInfo], groupSize : int = 1, extension : str = ".vhd", overwrite : bool = False):
+    CheckRegression(tbInfos, groupSize)
+    WriteRegressionPkg(path, name, tbInfos, groupSize, extension, overwrite)
+    with FileWriter(path + "/" + name + extension, overwrite=overwrite) as f:
+        CopyrightNotice(f)
+        VhdlTitle("Regression generated by TbGen.py", f)
+        f.WriteLn("-- see Library/Python/TbGenerator")
+        f.WriteLn()
+        VhdlTitle("Libraries", f)
+        f.WriteLn("library work;").IncIndent()
+        f.WriteLn("use work.{}_pkg.all;".format(name))
+        f.DecIndent().WriteLn()
+        VhdlTitle("Entity Declaration", f)
+        f.WriteLn("entity {} is".format(name))
+        f.WriteLn("end entity;").WriteLn()
+        VhdlTitle("Architecture", f)
+        f.WriteLn("architecture sim of {} is".format(name)).IncIndent()
+        VhdlTitle("Testbench Control", f, 2)
+        for tb in tbInfos:
+            f.WriteLn("signal Start_{} : boolean := false;".format(tb.tbName))
+            f.WriteLn("signal Done_{} : boolean := false;".format(tb.tbName))
+            f.WriteLn("signal TimedOut_{} : boolean := false;".format(tb.tbName))
+        f.DecIndent().WriteLn("begin").IncIndent()
+        VhdlTitle("Testbench Instances", f)
+        for tb in tbInfos:
+            f.WriteLn("i_{tb} : entity work.{tb}".format(tb=tb.tbName)).IncIndent()
+            f.WriteLn("port map (").IncIndent()
+            f.WriteLn("TbStart => Start_{},".format(tb.tbName))
+            f.WriteLn("TbDone => Done_{},".format(tb.tbName))
+            f.WriteLn("TbTimedOut => TimedOut_{}".format(tb.tbName))
+            f.DecIndent().WriteLn(");").DecIndent()
+            f.WriteLn("TbMonitor(\"{tb}\", Start_{tb}, Done_{tb}, TimedOut_{tb});".format(tb=tb.tbName))
+            f.WriteLn()
+        VhdlTitle("Regression Control !DO NOT EDIT!", f)
+        f.WriteLn("p_regression : process").IncIndent()
+        f.WriteLn("variable TimedOut_v : integer := 0;").DecIndent()
+        f.WriteLn("begin").IncIndent()
+        for i in range(0, len(tbInfos), groupSize):
+            group = tbInfos[i:i+groupSize]
+            f.WriteLn("-- Group {}".format(i // groupSize))
+            for tb in group:
+                f.WriteLn("Start_{} <= true;".format(tb.tbName))
+            f.WriteLn("wait until {};".format(" and ".join("Done_" + tb.tbName for tb in group)))
+        for tb in tbInfos:
+            f.WriteLn("if TimedOut_{} then".format(tb.tbName)).IncIndent()
+            f.WriteLn("TimedOut_v := TimedOut_v + 1;")
+            f.DecIndent().WriteLn("end if;")
+        f.WriteLn("if TimedOut_v > 0 then").IncIndent()
+        f.WriteLn("report \"Regression completed, \" & integer'image(TbCount_c) & \" testbenches run, \" & integer'image(TimedOut_v) & \" timed out\" severity error;")
+        f.DecIndent().WriteLn("else").IncIndent()
+        f.WriteLn("report \"Regression completed, \" & integer'image(TbCount_c) & \" testbenches run, all passed\" severity note;")
+        f.DecIndent().WriteLn("end if;")
+        f.WriteLn("wait;")
+        f.DecIndent().WriteLn("end process;")
+        f.DecIndent().WriteLn("end;")
@@ -0,0 +1,219 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+from PsiPyUtils import FileWriter
+from UtilFunc import VhdlTitle, CopyrightNotice
+import os
+import re
+
+#Increment whenever the generated support library changes
+SUPPORT_LIB_VERSION = "1.0.1"
+
+SUPPORT_PKG = "tbgen_support_pkg"
+CLOCK_ENTITY = "tbgen_clock"
+RESET_ENTITY = "tbgen_reset"
+SEQUENCER_ENTITY = "tbgen_case_sequencer"
+BARRIER_ENTITY = "tbgen_case_barrier"
+
+#Files in compile order
+SUPPORT_LIB_FILES = [SUPPORT_PKG, CLOCK_ENTITY, RESET_ENTITY, SEQUENCER_ENTITY, BARRIER_ENTITY]
+
+def SupportLibDeclaration(f : FileWriter, library : str) -> FileWriter:
+    f.WriteLn("library {};".format(library)).IncIndent()
+    f.WriteLn("use {}.{}.all;".format(library, SUPPORT_PKG))
+    f.DecIndent().WriteLn()
+    return f
+
+def SupportLibVersion(path : str, extension : str = ".vhd") -> str:
+    pkgFile = path + "/" + SUPPORT_PKG + extension
+    if not os.path.isfile(pkgFile):
+        return None
+    with open(pkgFile, "r") as f:
+        match = re.search(r"TbGenSupportVersion_c\s*:\s*string\s*:=\s*\"([^\"]*)\"", f.read())
+    return match.group(1) if match is not None else None
+
+def _Header(f : FileWriter, title : str) -> FileWriter:
+    CopyrightNotice(f)
+    VhdlTitle(title, f)
+    f.WriteLn("-- Support library generated by TbGen.py, version {} !DO NOT EDIT!".format(SUPPORT_LIB_VERSION))
+    f.WriteLn("-- see Library/Python/TbGenerator")
+    f.WriteLn()
+    VhdlTitle("Libraries", f)
+    f.WriteLn("library ieee;").IncIndent()
+    f.WriteLn("use ieee.std_logic_1164.all;")
+    f.DecIndent().WriteLn()
+    return f
+
+def _WritePkg(f : FileWriter):
+    _Header(f, "Support Package")
+    VhdlTitle("Package Header", f)
+    f.WriteLn("package {} is".format(SUPPORT_PKG)).IncIndent()
+    f.WriteLn()
+    f.WriteLn("constant TbGenSupportVersion_c : string := \"{}\";".format(SUPPORT_LIB_VERSION))
+    f.WriteLn()
+    VhdlTitle("Barrier Handshake", f, 2)
+    f.WriteLn("type TbCaseNr_a is array (natural range <>) of integer;")
+    f.WriteLn("function TbMinCase(CaseNrs : TbCaseNr_a) return integer;")
+    f.WriteLn("subtype TbCaseDone_t is TbMinCase integer;")
+    f.WriteLn()
+    f.DecIndent().WriteLn("end package;")
+    f.WriteLn()
+    VhdlTitle("Package Body", f)
+    f.WriteLn("package body {} is".format(SUPPORT_PKG)).IncIndent()
+    f.WriteLn()
+    f.WriteLn("function TbMinCase(CaseNrs : TbCaseNr_a) return integer is").IncIndent()
+    f.WriteLn("variable Min_v : integer := integer'high;").DecIndent()
+    f.WriteLn("begin").IncIndent()
+    f.WriteLn("for i in CaseNrs'range loop").IncIndent()
+    f.WriteLn("if CaseNrs(i) < Min_v then").IncIndent()
+    f.WriteLn("Min_v := CaseNrs(i);")
+    f.DecIndent().WriteLn("end if;")
+    f.DecIndent().WriteLn("end loop;")
+    f.WriteLn("return Min_v;")
+    f.DecIndent().WriteLn("end function;")
+    f.WriteLn()
+    f.DecIndent().WriteLn("end;")
+
+def _WriteWaitStart(f : FileWriter) -> FileWriter:
+    f.WriteLn("if not Start then").IncIndent()
+    f.WriteLn("wait until Start;")
+    f.DecIndent().WriteLn("end if;")
+    return f
+
+def _WriteClock(f : FileWriter):
+    _Header(f, "Clock Generator")
+    VhdlTitle("Entity Declaration", f)
+    f.WriteLn("entity {} is".format(CLOCK_ENTITY)).IncIndent()
+    f.WriteLn("generic (").IncIndent()
+    f.WriteLn("Frequency_g : real;")
+    f.WriteLn("InitVal_g : std_logic := '1'")
+    f.DecIndent().WriteLn(");")
+    f.WriteLn("port (").IncIndent()
+    f.WriteLn("Start : in boolean := true;")
+    f.WriteLn("Running : in boolean;")
+    f.WriteLn("Clk : out std_logic := InitVal_g")
+    f.DecIndent().WriteLn(");")
+    f.DecIndent().WriteLn("end entity;")
+    f.WriteLn()
+    VhdlTitle("Architecture", f)
+    f.WriteLn("architecture sim of {} is".format(CLOCK_ENTITY)).IncIndent()
+    f.WriteLn("signal Clk_s : std_logic := InitVal_g;")
+    f.DecIndent().WriteLn("begin").IncIndent()
+    f.WriteLn("Clk <= Clk_s;")
+    f.WriteLn()
+    f.WriteLn("p_clock : process")
+    f.WriteLn("begin").IncIndent()
+    _WriteWaitStart(f)
+    f.WriteLn("while Running loop").IncIndent()
+    f.WriteLn("wait for 0.5*(1 sec)/Frequency_g;")
+    f.WriteLn("Clk_s <= not Clk_s;")
+    f.DecIndent().WriteLn("end loop;")
+    f.WriteLn("wait;")
+    f.DecIndent().WriteLn("end process;")
+    f.DecIndent().WriteLn("end;")
+
+def _WriteReset(f : FileWriter):
+    _Header(f, "Reset Sequencer")
+    VhdlTitle("Entity Declaration", f)
+    f.WriteLn("entity {} is".format(RESET_ENTITY)).IncIndent()
+    f.WriteLn("generic (").IncIndent()
+    f.WriteLn("ActiveVal_g : std_logic := '1'")
+    f.DecIndent().WriteLn(");")
+    f.WriteLn("port (").IncIndent()
+    f.WriteLn("Start : in boolean := true;")
+    f.WriteLn("Clk : in std_logic;")
+    f.WriteLn("Rst : out std_logic := ActiveVal_g")
+    f.DecIndent().WriteLn(");")
+    f.DecIndent().WriteLn("end entity;")
+    f.WriteLn()
+    VhdlTitle("Architecture", f)
+    f.WriteLn("architecture sim of {} is".format(RESET_ENTITY))
+    f.WriteLn("begin").IncIndent()
+    f.WriteLn("p_rst : process")
+    f.WriteLn("begin").IncIndent()
+    _WriteWaitStart(f)
+    f.WriteLn("wait for 1 us;")
+    f.WriteLn("-- Wait for two clk edges to ensure reset is active for at least one edge")
+    f.WriteLn("wait until rising_edge(Clk);")
+    f.WriteLn("wait until rising_edge(Clk);")
+    f.WriteLn("Rst <= not ActiveVal_g;")
+    f.WriteLn("wait;")
+    f.DecIndent().WriteLn("end process;")
+    f.DecIndent().WriteLn("end;")
+
+#Start may rise in the same delta cycle the processes complete (e.g. a single case TB finishing in zero time after reset),
+#so the condition is checked before waiting for it to change
+def _WriteWaitDone(f : FileWriter, doneCondition : str) -> FileWriter:
+    f.WriteLn("if not ({}) then".format(doneCondition)).IncIndent()
+    f.WriteLn("wait until {};".format(doneCondition))
+    f.DecIndent().WriteLn("end if;")
+    return f
+
+def _WriteSequencer(f : FileWriter, barrier : bool):
+    entity = BARRIER_ENTITY if barrier else SEQUENCER_ENTITY
+    _Header(f, "Test Case Sequencer")
+    VhdlTitle("Entity Declaration", f)
+    f.WriteLn("entity {} is".format(entity)).IncIndent()
+    f.WriteLn("generic (").IncIndent()
+    f.WriteLn("CaseCount_g : natural := 0 -- 0 for single case testbenches")
+    f.DecIndent().WriteLn(");")
+    f.WriteLn("port (").IncIndent()
+    f.WriteLn("Start : in boolean := true;")
+    if barrier:
+        f.WriteLn("CaseDone : in integer;")
+    else:
+        f.WriteLn("ProcessDone : in std_logic_vector;")
+    f.WriteLn("NextCase : out integer := -1;")
+    f.WriteLn("Running : out boolean := true")
+    f.DecIndent().WriteLn(");")
+    f.DecIndent().WriteLn("end entity;")
+    f.WriteLn()
+    VhdlTitle("Architecture", f)
+    f.WriteLn("architecture sim of {} is".format(entity)).IncIndent()
+    if barrier:
+        doneCondition = "CaseDone = CaseNr"
+    else:
+        f.WriteLn("constant AllProcessesDone_c : std_logic_vector(ProcessDone'range) := (others => '1');")
+        doneCondition = "ProcessDone = AllProcessesDone_c"
+    f.DecIndent().WriteLn("begin").IncIndent()
+    f.WriteLn("p_control : process")
+    f.WriteLn("begin").IncIndent()
+    _WriteWaitStart(f)
+    f.WriteLn("if CaseCount_g = 0 then").IncIndent()
+    _WriteWaitDone(f, doneCondition.replace("CaseNr", "0"))
+    f.DecIndent().WriteLn("else").IncIndent()
+    f.WriteLn("for CaseNr in 0 to CaseCount_g-1 loop").IncIndent()
+    f.WriteLn("NextCase <= CaseNr;")
+    if barrier:
+        _WriteWaitDone(f, doneCondition)
+    else:
+        #ProcessDone still holds the completion of the previous case here, only a new event can complete this case
+        f.WriteLn("wait until {};".format(doneCondition))
+    f.DecIndent().WriteLn("end loop;")
+    f.DecIndent().WriteLn("end if;")
+    f.WriteLn("Running <= false;")
+    f.WriteLn("wait;")
+    f.DecIndent().WriteLn("end process;")
+    f.DecIndent().WriteLn("end;")
+
+#Returns False if the library in path is already up to date and nothing was written
+def WriteSupportLib(path : str, extension : str = ".vhd") -> bool:
+    upToDate = SupportLibVersion(path, extension) == SUPPORT_LIB_VERSION
+    if upToDate and all(os.path.isfile(path + "/" + name + extension) for name in SUPPORT_LIB_FILES):
+        return False
+    if not os.path.exists(path):
+        os.makedirs(path)
+    with FileWriter(path + "/" + SUPPORT_PKG + extension, overwrite=True) as f:
+        _WritePkg(f)
+    with FileWriter(path + "/" + CLOCK_ENTITY + extension, overwrite=True) as f:
+        _WriteClock(f)
+    with FileWriter(path + "/" + RESET_ENTITY + extension, overwrite=True) as f:
+        _WriteReset(f)
+    with FileWriter(path + "/" + SEQUENCER_ENTITY + extension, overwrite=True) as f:
+        _WriteSequencer(f, barrier=False)
+    with FileWriter(path + "/" + BARRIER_ENTITY + extension, overwrite=True) as f:
+        _WriteSequencer(f, barrier=True)
+    return True
@@ -0,0 +1,195 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+from DutInfo import DutInfo, Tags, UnknownVhdlType
+from TbInfo import TIMEOUT_FORMAT
+from typing import List
+import re
+
+class TagValidationError(Exception):
+
+    def __init__(self, errors : List[str]):
+        super().__init__("Illegal tags:\n" + "\n".join(errors))
+        self.errors = errors
+
+VHDL_IDENTIFIER = re.compile(r"^[a-zA-Z](_?[a-zA-Z0-9])*$")
+VHDL_PACKAGE = re.compile(r"^[a-zA-Z]\w*\.[a-zA-Z]\w*$")
+
+FILE_SCOPE_TAGS = [Tags.PROCESSES, Tags.TESTCASES, Tags.DUTLIB, Tags.TBPKG, Tags.TIMINGREPORT, Tags.TIMEOUT, Tags.TIMEOUTCLK]
+GENERIC_TAGS = [Tags.EXPORT, Tags.CONSTANT]
+PORT_TAGS = [Tags.LOWACTIVE, Tags.TYPE, Tags.CLK, Tags.FREQ, Tags.PROC]
+PORT_TYPES = ["clk", "rst", "sig"]
+BOOLEANS = ["true", "false"]
+
+#Checks all tags of a parsed DUT before any output is written, all problems are collected and reported at once
+class TagValidator:
+
+    def __init__(self, dutInfo : DutInfo):
+        self.dutInfo = dutInfo
+        self.errors = []
+        self.warnings = []
+
+    #Raises TagValidationError listing all errors found, returns the list of warnings otherwise
+    def Validate(self) -> List[str]:
+        self.errors = []
+        self.warnings = []
+        self._CheckFileScope()
+        for g in self.dutInfo.generics:
+            self._CheckGeneric(g)
+        processes = [p.lower() for p in self._FileScopeList(Tags.PROCESSES, ["Stimuli"])]
+        for p in self.dutInfo.ports:
+            self._CheckPort(p, processes)
+        if len(self.errors) > 0:
+            raise TagValidationError(self.errors)
+        return self.warnings
+
+    def _Location(self, lineNr : int) -> str:
+        if lineNr is None:
+            return "{}".format(self.dutInfo.fileName)
+        return "{}:{}".format(self.dutInfo.fileName, lineNr)
+
+    def _Error(self, lineNr : int, msg : str):
+        self.errors.append("{}: {}".format(self._Location(lineNr), msg))
+
+    def _Warning(self, lineNr : int, msg : str):
+        self.warnings.append("{}: {}".format(self._Location(lineNr), msg))
+
+    def _FileScopeList(self, tag : str, default : List[str] = None) -> List[str]:
+        if tag not in self.dutInfo.fileScopeTags:
+            return default
+        value = self.dutInfo.fileScopeTags[tag]
+        return [value] if type(value) is str else value
+
+    def _ParseTags(self, obj, kind : str) -> dict:
+        if obj.comment is None:
+            return {}
+        tags = DutInfo._ParseTags(obj.comment)
+        if len(tags) == 0 and "$$" in obj.comment:
+            self._Warning(obj.lineNr, "Tags of {} {} could not be parsed".format(kind, obj.name))
+        return tags
+
+    def _CheckSingle(self, lineNr : int, tag : str, value) -> bool:
+        if type(value) is not str:
+            self._Error(lineNr, "{} tag takes a single value, got {}".format(tag.upper(), ",".join(value)))
+            return False
+        return True
+
+    def _CheckIdentifiers(self, lineNr : int, tag : str, values : List[str]):
+        for v in values:
+            if VHDL_IDENTIFIER.match(v) is None:
+                self._Error(lineNr, "{} value '{}' is not a legal VHDL identifier".format(tag.upper(), v))
+        lower = [v.lower() for v in values]
+        for v in sorted(set(lower)):
+            if lower.count(v) > 1:
+                self._Error(lineNr, "{} value '{}' is given more than once".format(tag.upper(), v))
+
+    def _ClockNames(self) -> List[str]:
+        return [c.name.lower() for c in DutInfo.FilterForTag(self.dutInfo.ports, Tags.TYPE, "clk")]
+
+    def _CheckFileScope(self):
+        tags = self.dutInfo.fileScopeTags
+        lines = self.dutInfo.fileScopeTagLines
+        for c in self.dutInfo.parseInfo.commentLines:
+            if "$$" in c.comment and len(DutInfo._ParseTags(c.comment)) == 0:
+                self._Warning(c.lineNr, "Tags could not be parsed")
+        for tag in tags:
+            if tag not in FILE_SCOPE_TAGS:
+                self._Warning(lines[tag], "Unknown file scope tag {}".format(tag.upper()))
+        for tag in [Tags.PROCESSES, Tags.TESTCASES]:
+            if tag in tags:
+                self._CheckIdentifiers(lines[tag], tag, self._FileScopeList(tag))
+        if Tags.DUTLIB in tags:
+            if self._CheckSingle(lines[Tags.DUTLIB], Tags.DUTLIB, tags[Tags.DUTLIB]):
+                self._CheckIdentifiers(lines[Tags.DUTLIB], Tags.DUTLIB, [tags[Tags.DUTLIB]])
+        if Tags.TBPKG in tags:
+            for pkg in self._FileScopeList(Tags.TBPKG):
+                if VHDL_PACKAGE.match(pkg) is None:
+                    self._Error(lines[Tags.TBPKG], "TBPKG value '{}' is not in the form <library>.<package>".format(pkg))
+        if Tags.TIMINGREPORT in tags:
+            self._CheckSingle(lines[Tags.TIMINGREPORT], Tags.TIMINGREPORT, tags[Tags.TIMINGREPORT])
+        if Tags.TIMEOUT in tags:
+            self._CheckTimeout()
+        elif Tags.TIMEOUTCLK in tags:
+            self._Warning(lines[Tags.TIMEOUTCLK], "TIMEOUTCLK tag has no effect without TIMEOUT tag")
+
+    def _CheckTimeout(self):
+        tags = self.dutInfo.fileScopeTags
+        lineNr = self.dutInfo.fileScopeTagLines[Tags.TIMEOUT]
+        timeouts = self._FileScopeList(Tags.TIMEOUT)
+        testCases = self._FileScopeList(Tags.TESTCASES)
+        if len(timeouts) > 1 and (testCases is None or len(timeouts) != len(testCases)):
+            self._Error(lineNr, "TIMEOUT tag must contain one value or one value per test case")
+        for t in timeouts:
+            match = TIMEOUT_FORMAT.match(t)
+            if match is None:
+                self._Error(lineNr, "Illegal TIMEOUT value '{}'".format(t))
+            elif match.group(4) is None and Tags.TIMEOUTCLK not in tags:
+                self._Error(lineNr, "TIMEOUT value '{}' has no time unit and no TIMEOUTCLK tag is given".format(t))
+        if Tags.TIMEOUTCLK in tags:
+            clkLine = self.dutInfo.fileScopeTagLines[Tags.TIMEOUTCLK]
+            if self._CheckSingle(clkLine, Tags.TIMEOUTCLK, tags[Tags.TIMEOUTCLK]):
+                if tags[Tags.TIMEOUTCLK].lower() not in self._ClockNames():
+                    self._Error(clkLine, "TIMEOUTCLK {} is not a port with TYPE=CLK".format(tags[Tags.TIMEOUTCLK]))
+
+    def _CheckGeneric(self, g):
+        tags = self._ParseTags(g, "generic")
+        for tag in tags:
+            if tag not in GENERIC_TAGS:
+                self._Warning(g.lineNr, "Unknown tag {} on generic {}".format(tag.upper(), g.name))
+        if Tags.EXPORT in tags:
+            if self._CheckSingle(g.lineNr, Tags.EXPORT, tags[Tags.EXPORT]) and tags[Tags.EXPORT].lower() not in BOOLEANS:
+                self._Error(g.lineNr, "EXPORT tag of generic {} must be true or false".format(g.name))
+        if Tags.CONSTANT in tags:
+            self._CheckSingle(g.lineNr, Tags.CONSTANT, tags[Tags.CONSTANT])
+        elif g.default is None and str(tags.get(Tags.EXPORT, "")).lower() != "true":
+            self._Error(g.lineNr, "Generic {} has no default value and neither a CONSTANT nor EXPORT=true tag".format(g.name))
+
+    def _CheckPort(self, p, processes : List[str]):
+        tags = self._ParseTags(p, "port")
+        for tag in tags:
+            if tag not in PORT_TAGS:
+                self._Warning(p.lineNr, "Unknown tag {} on port {}".format(tag.upper(), p.name))
+        portType = None
+        if Tags.TYPE in tags and self._CheckSingle(p.lineNr, Tags.TYPE, tags[Tags.TYPE]):
+            portType = tags[Tags.TYPE].lower()
+            if portType not in PORT_TYPES:
+                self._Error(p.lineNr, "TYPE of port {} must be one of {}".format(p.name, ", ".join(t.upper() for t in PORT_TYPES)))
+        if Tags.LOWACTIVE in tags:
+            if self._CheckSingle(p.lineNr, Tags.LOWACTIVE, tags[Tags.LOWACTIVE]) and tags[Tags.LOWACTIVE].lower() not in BOOLEANS:
+                self._Error(p.lineNr, "LOWACTIVE tag of port {} must be true or false".format(p.name))
+        #Clocks and resets are driven with values of their type
+        if portType in ["clk", "rst"]:
+            try:
+                self.dutInfo.GetPortValue(p, True)
+            except UnknownVhdlType as e:
+                self._Error(p.lineNr, "{} {} cannot be driven: {}".format("Clock" if portType == "clk" else "Reset", p.name, e))
+        #Clocks
+        if portType == "clk":
+            if Tags.FREQ not in tags:
+                self._Error(p.lineNr, "Clock {} has no FREQ tag".format(p.name))
+            elif self._CheckSingle(p.lineNr, Tags.FREQ, tags[Tags.FREQ]):
+                try:
+                    float(tags[Tags.FREQ])
+                except ValueError:
+                    self._Error(p.lineNr, "FREQ of clock {} is not a number: {}".format(p.name, tags[Tags.FREQ]))
+        elif Tags.FREQ in tags:
+            self._Warning(p.lineNr, "FREQ tag of port {} is ignored since it is not a clock".format(p.name))
+        #Resets
+        if portType == "rst":
+            if Tags.CLK not in tags:
+                self._Error(p.lineNr, "Reset {} has no CLK tag".format(p.name))
+            elif self._CheckSingle(p.lineNr, Tags.CLK, tags[Tags.CLK]) and tags[Tags.CLK].lower() not in self._ClockNames():
+                self._Error(p.lineNr, "CLK tag of reset {} refers to {} which is not a port with TYPE=CLK".format(p.name, tags[Tags.CLK]))
+        elif Tags.CLK in tags:
+            self._Warning(p.lineNr, "CLK tag of port {} is ignored since it is not a reset".format(p.name))
+        #Processes
+        if Tags.PROC in tags:
+            for proc in DutInfo.GetTagAsList(p, Tags.PROC):
+                if proc.lower() not in processes:
+                    self._Error(p.lineNr, "PROC tag of port {} refers to unknown process {}".format(p.name, proc))
+
+def ValidateTags(dutInfo : DutInfo) -> List[str]:
+    return TagValidator(dutInfo).Validate()
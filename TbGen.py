@@ -15,19 +15,42 @@ from PsiPyUtils import FileWriter
 from UtilFunc import VhdlTitle, CopyrightNotice
 from MultiFileTb import WriteTbPkg, WriteCasePkg
 from DutInfo import DutInfo, Tags, UnknownVhdlType
-from TbInfo import TbInfo
+from TbInfo import TbInfo, CheckTbNames
+from VhdlParse import VhdlPortDeclaration, VhdlSource
+from TagValidation import ValidateTags
+from RegressionTb import WriteRegressionTb, CheckRegression
+from SupportLib import WriteSupportLib, SupportLibDeclaration, CLOCK_ENTITY, RESET_ENTITY, SEQUENCER_ENTITY, BARRIER_ENTITY
 import os
 from argparse import ArgumentParser
+from typing import Union, IO, Iterable
 import shutil
 
+class Handshake:
+    VECTOR = "vector"   #ProcessDone vector, every process pulses its bit after each case
+    BARRIER = "barrier" #Resolved CaseDone signal, the control process only wakes up once per case
+
 class TbGenerator:
 
-    def __init__(self):
+    def __init__(self, regression : bool = False, compact : bool = False, handshake : str = Handshake.VECTOR, supportLib : str = None):
         self.dutInfo = None
         self.tbInfo = None
+        self.warnings = []
+        #Add TbStart/TbDone ports so the TB can be instantiated in a regression top-level
+        self.regression = regression
+        #Dispatch test cases through a case statement instead of unrolling them for every process
+        self.compact = compact
+        if handshake not in [Handshake.VECTOR, Handshake.BARRIER]:
+            raise Exception("Illegal handshake {}!".format(handshake))
+        self.handshake = handshake
+        #Library containing the shared clock, reset and sequencer entities (None to inline them)
+        self.supportLib = supportLib
 
-    def ReadHdl(self, filePath : str):
-        self.dutInfo = DutInfo(filePath)
+    #source is a file path, VHDL code (VhdlSource.FromText() or bytes) or a file-like object,
+    #sourceName is used in diagnostics instead of the file path, searchPath lists directories containing packages used by the DUT
+    def ReadHdl(self, source : Union[str, bytes, os.PathLike, IO, VhdlSource], sourceName : str = None, searchPath : Iterable[str] = None):
+        self.dutInfo = DutInfo(source, sourceName, searchPath)
+        #Check all tags before anything is generated
+        self.warnings = ValidateTags(self.dutInfo) + self.dutInfo.typeWarnings
         self.tbInfo = TbInfo(self.dutInfo)
 
     def _DutInstantiation(self, f : FileWriter) -> FileWriter:
@@ -53,9 +76,23 @@ class TbGenerator:
         for clk in DutInfo.FilterForTag(self.dutInfo.ports, Tags.TYPE, "clk"):
             if not DutInfo.HasTag(clk, Tags.FREQ):
                 raise Exception("Clock {} has not FREQ tag!".format(clk.name))
+            if self._UseSupportLib(clk):
+                f.WriteLn("i_clock_{} : entity {}.{}".format(clk.name, self.supportLib, CLOCK_ENTITY)).IncIndent()
+                f.WriteLn("generic map (").IncIndent()
+                f.WriteLn("Frequency_g => real({}),".format(DutInfo.GetTag(clk, Tags.FREQ)))
+                f.WriteLn("InitVal_g => {}".format(self.dutInfo.GetPortValue(clk, True)))
+                f.DecIndent().WriteLn(")")
+                f.WriteLn("port map (").IncIndent()
+                self._SupportLibStart(f, "TbStart")
+                f.WriteLn("Running => TbRunning,")
+                f.WriteLn("Clk => {}".format(clk.name))
+                f.DecIndent().WriteLn(");").DecIndent()
+                f.WriteLn()
+                continue
             f.WriteLn("p_clock_{} : process".format(clk.name)).IncIndent()
             f.WriteLn("constant Frequency_c : real := real({});".format(DutInfo.GetTag(clk, Tags.FREQ))).DecIndent()
             f.WriteLn("begin").IncIndent()
+            self._WaitTbStart(f)
             f.WriteLn("while TbRunning loop").IncIndent()
             f.WriteLn("wait for 0.5*(1 sec)/Frequency_c;")
             f.WriteLn("{name} <= not {name};".format(name=clk.name))
@@ -71,8 +108,21 @@ class TbGenerator:
             if not DutInfo.HasTag(rst, Tags.CLK):
                 raise Exception("Reset {} has not CLK tag!".format(rst.name))
             clkName = DutInfo.GetTag(rst, Tags.CLK)
+            if self._UseSupportLib(rst):
+                f.WriteLn("i_rst_{} : entity {}.{}".format(rst.name, self.supportLib, RESET_ENTITY)).IncIndent()
+                f.WriteLn("generic map (").IncIndent()
+                f.WriteLn("ActiveVal_g => {}".format(self.dutInfo.GetPortValue(rst, True)))
+                f.DecIndent().WriteLn(")")
+                f.WriteLn("port map (").IncIndent()
+                self._SupportLibStart(f, "TbStart")
+                f.WriteLn("Clk => {},".format(clkName))
+                f.WriteLn("Rst => {}".format(rst.name))
+                f.DecIndent().WriteLn(");").DecIndent()
+                f.WriteLn()
+                continue
             f.WriteLn("p_rst_{} : process".format(rst.name))
             f.WriteLn("begin").IncIndent()
+            self._WaitTbStart(f)
             f.WriteLn("wait for 1 us;")
             f.WriteLn("-- Wait for two clk edges to ensure reset is active for at least one edge")
             f.WriteLn("wait until rising_edge({});".format(clkName))
@@ -93,19 +143,32 @@ class TbGenerator:
             VhdlTitle(p, f, 2)
             f.WriteLn("p_{} : process".format(p))
             f.WriteLn("begin").IncIndent()
-            if self.tbInfo.isMultiCaseTb:
+            if self.tbInfo.isMultiCaseTb and self.compact:
+                args = ", ".join(port.name for port in self.tbInfo.GetPortsForProcess(p))
+                f.WriteLn("for CaseNr in 0 to {} loop".format(len(self.tbInfo.testCases)-1)).IncIndent()
+                f.WriteLn("wait until NextCase = CaseNr;")
+                self._ProcessCaseStart(f, p)
+                f.WriteLn("case CaseNr is").IncIndent()
+                for i, c in enumerate(self.tbInfo.testCases):
+                    f.WriteLn("when {i} => work.{tb}_case_{case}.{proc}({args}, Generics_c);".format(i=i, tb=self.tbInfo.tbName, case=c, proc=p, args=args))
+                f.WriteLn("when others => null;")
+                f.DecIndent().WriteLn("end case;")
+                self._ProcessCaseDone(f, p, "CaseNr")
+                f.DecIndent().WriteLn("end loop;")
+            elif self.tbInfo.isMultiCaseTb:
                 for i, c in enumerate(self.tbInfo.testCases):
                     f.WriteLn("-- {}".format(c))
                     f.WriteLn("wait until NextCase = {};".format(i))
-                    f.WriteLn("ProcessDone(TbProcNr_{}_c) <= '0';".format(p))
+                    self._ProcessCaseStart(f, p)
                     args = ", ".join(port.name for port in self.tbInfo.GetPortsForProcess(p))
                     f.WriteLn("work.{tb}_case_{case}.{proc}({args}, Generics_c);".format(tb=self.tbInfo.tbName, case=c, proc=p, args=args))
-                    f.WriteLn("wait for 1 ps;")
-                    f.WriteLn("ProcessDone(TbProcNr_{}_c) <= '1';".format(p))
+                    self._ProcessCaseDone(f, p, str(i))
             else:
                 rsts = DutInfo.FilterForTag(self.dutInfo.ports, Tags.TYPE, "rst")
-                if len(rsts) > 0:
+                if len(rsts) > 0 or self.regression:
                     f.WriteLn("-- start of process !DO NOT EDIT")
+                    self._WaitTbStart(f)
+                if len(rsts) > 0:
                     rstLogic = " and ".join([r.name + " = " + self.dutInfo.GetPortValue(r, False) for r in rsts])
                     f.WriteLn("wait until {};".format(rstLogic))
                 f.WriteLn()
@@ -113,31 +176,235 @@ class TbGenerator:
                 f.WriteLn("assert False report \"Insert your code here!\" severity note;")
                 f.WriteLn()
                 f.WriteLn("-- end of process !DO NOT EDIT!")
-                f.WriteLn("ProcessDone(TbProcNr_{}_c) <= '1';".format(p))
+                self._ProcessCaseDone(f, p, "0", pulse=False)
             f.WriteLn("wait;")
             f.DecIndent().WriteLn("end process;")
             f.WriteLn()
         return f
 
+    def _ProcessCaseStart(self, f : FileWriter, process : str) -> FileWriter:
+        if self.handshake == Handshake.VECTOR:
+            f.WriteLn("ProcessDone(TbProcNr_{}_c) <= '0';".format(process))
+        return f
+
+    def _ProcessCaseDone(self, f : FileWriter, process : str, caseNr : str, pulse : bool = True) -> FileWriter:
+        if self.handshake == Handshake.BARRIER:
+            #ProcessCase is only read by the TIMEOUT watchdog, without it the transactions are saved
+            if self.tbInfo.caseTimeouts is not None:
+                f.WriteLn("ProcessCase(TbProcNr_{}_c) <= {};".format(process, caseNr))
+            f.WriteLn("CaseDone <= {};".format(caseNr))
+        else:
+            if pulse:
+                f.WriteLn("wait for 1 ps;")
+            f.WriteLn("ProcessDone(TbProcNr_{}_c) <= '1';".format(process))
+        return f
+
+    def _CaseDoneCondition(self, caseNr : str) -> str:
+        if self.handshake == Handshake.BARRIER:
+            return "CaseDone = {}".format(caseNr)
+        return "ProcessDone = AllProcessesDone_c"
+
+    def _TbControlDeclarations(self, f : FileWriter) -> FileWriter:
+        report = self.tbInfo.timingReport is not None
+        timeout = self.tbInfo.caseTimeouts is not None
+        barrier = self.handshake == Handshake.BARRIER
+        if report:
+            f.WriteLn("file TbReport_f : text open write_mode is \"{}\";".format(self.tbInfo.timingReport))
+            f.WriteLn("variable TbReportLine_v : line;")
+            f.WriteLn()
+            f.WriteLn("procedure TbReport(CaseName, ProcName : string; StartTime : time) is")
+            f.WriteLn("begin").IncIndent()
+            f.WriteLn("write(TbReportLine_v, string'(\"{},\") & CaseName & \",\" & ProcName & \",\");".format(self.tbInfo.tbName))
+            f.WriteLn("write(TbReportLine_v, StartTime, left, 0, ps);")
+            f.WriteLn("write(TbReportLine_v, string'(\",\"));")
+            f.WriteLn("write(TbReportLine_v, now, left, 0, ps);")
+            f.WriteLn("writeline(TbReport_f, TbReportLine_v);")
+            f.DecIndent().WriteLn("end procedure;")
+            f.WriteLn()
+        if timeout:
+            #Report pending processes, stop the clocks and end the simulation
+            if barrier:
+                f.WriteLn("procedure TbTimeout(CaseName : string; CaseNr : integer; Timeout : time) is")
+            else:
+                f.WriteLn("procedure TbTimeout(CaseName : string; Timeout : time) is")
+            f.WriteLn("begin").IncIndent()
+            for p in self.tbInfo.tbProcesses:
+                if barrier:
+                    f.WriteLn("if ProcessCase(TbProcNr_{}_c) < CaseNr then".format(p)).IncIndent()
+                else:
+                    f.WriteLn("if ProcessDone(TbProcNr_{}_c) = '0' then".format(p)).IncIndent()
+                f.WriteLn("report \"Timeout in case \" & CaseName & \": process {} did not complete\" severity error;".format(p))
+                f.DecIndent().WriteLn("end if;")
+            f.WriteLn("TbRunning <= false;")
+            if self.regression:
+                #Only this TB is stopped, the regression continues with the next TBs
+                f.WriteLn("TbTimedOut <= true;")
+                f.WriteLn("report \"Timeout in case \" & CaseName & \" after \" & time'image(Timeout) & \", testbench aborted\" severity error;")
+            else:
+                f.WriteLn("report \"Timeout in case \" & CaseName & \" after \" & time'image(Timeout) & \", simulation aborted\" severity failure;")
+            f.WriteLn("wait;")
+            f.DecIndent().WriteLn("end procedure;")
+            f.WriteLn()
+        #Wait for all processes to complete the current case
+        if barrier:
+            self._TbWaitCaseBarrier(f)
+            return f
+        if timeout:
+            f.WriteLn("procedure TbWaitCase(CaseName : string; Timeout : time) is").IncIndent()
+        else:
+            f.WriteLn("procedure TbWaitCase(CaseName : string) is").IncIndent()
+        f.WriteLn("variable Start_v : time;")
+        if report:
+            f.WriteLn("variable Done_v : std_logic_vector(ProcessDone'range);")
+        f.DecIndent().WriteLn("begin").IncIndent()
+        f.WriteLn("Start_v := now;")
+        if report:
+            f.WriteLn("Done_v := ProcessDone;")
+        f.WriteLn("loop").IncIndent()
+        if timeout:
+            f.WriteLn("wait on ProcessDone for Timeout - (now - Start_v);")
+        else:
+            f.WriteLn("wait on ProcessDone;")
+        if report:
+            for p in self.tbInfo.tbProcesses:
+                f.WriteLn("if ProcessDone(TbProcNr_{p}_c) = '1' and Done_v(TbProcNr_{p}_c) = '0' then".format(p=p)).IncIndent()
+                f.WriteLn("TbReport(CaseName, \"{}\", Start_v);".format(p))
+                f.DecIndent().WriteLn("end if;")
+            f.WriteLn("Done_v := ProcessDone;")
+        f.WriteLn("exit when ProcessDone = AllProcessesDone_c;")
+        if timeout:
+            f.WriteLn("if now - Start_v >= Timeout then").IncIndent()
+            f.WriteLn("TbTimeout(CaseName, Timeout);")
+            f.DecIndent().WriteLn("end if;")
+        f.DecIndent().WriteLn("end loop;")
+        if report:
+            f.WriteLn("TbReport(CaseName, \"*\", Start_v);")
+        f.DecIndent().WriteLn("end procedure;")
+        return f
+
+    #With the barrier handshake only the completion of the case is visible, not the one of the individual processes
+    def _TbWaitCaseBarrier(self, f : FileWriter) -> FileWriter:
+        if self.tbInfo.caseTimeouts is not None:
+            f.WriteLn("procedure TbWaitCase(CaseName : string; CaseNr : integer; Timeout : time) is").IncIndent()
+        else:
+            f.WriteLn("procedure TbWaitCase(CaseName : string; CaseNr : integer) is").IncIndent()
+        f.WriteLn("variable Start_v : time;").DecIndent()
+        f.WriteLn("begin").IncIndent()
+        f.WriteLn("Start_v := now;")
+        if self.tbInfo.caseTimeouts is not None:
+            f.WriteLn("wait until CaseDone = CaseNr for Timeout;")
+            f.WriteLn("if CaseDone /= CaseNr then").IncIndent()
+            f.WriteLn("TbTimeout(CaseName, CaseNr, Timeout);")
+            f.DecIndent().WriteLn("end if;")
+        else:
+            f.WriteLn("wait until CaseDone = CaseNr;")
+        if self.tbInfo.timingReport is not None:
+            f.WriteLn("TbReport(CaseName, \"*\", Start_v);")
+        f.DecIndent().WriteLn("end procedure;")
+        return f
+
+    def _UseSupportLib(self, port : VhdlPortDeclaration) -> bool:
+        #The support library entities only drive std_logic, other types are generated inline
+        return (self.supportLib is not None) and (port.type.name.lower() == "std_logic")
+
+    def _UseSequencer(self) -> bool:
+        #The sequencer does not implement timing report and timeout
+        return (self.supportLib is not None) and not self._HasTbControlProcedures()
+
+    def _SupportLibStart(self, f : FileWriter, startSignal : str) -> FileWriter:
+        if self.regression:
+            f.WriteLn("Start => {},".format(startSignal))
+        return f
+
+    def _TbSequencer(self, f : FileWriter) -> FileWriter:
+        rsts = DutInfo.FilterForTag(self.dutInfo.ports, Tags.TYPE, "rst")
+        if len(rsts) > 0:
+            rstLogic = " and ".join([r.name + " = " + self.dutInfo.GetPortValue(r, False) for r in rsts])
+            f.WriteLn("TbResetDone <= {};".format(rstLogic))
+        if self.handshake == Handshake.BARRIER:
+            entity = BARRIER_ENTITY
+        else:
+            entity = SEQUENCER_ENTITY
+        f.WriteLn("i_tb_control : entity {}.{}".format(self.supportLib, entity)).IncIndent()
+        f.WriteLn("generic map (").IncIndent()
+        f.WriteLn("CaseCount_g => {}".format(len(self.tbInfo.testCases) if self.tbInfo.isMultiCaseTb else 0))
+        f.DecIndent().WriteLn(")")
+        f.WriteLn("port map (").IncIndent()
+        if len(rsts) > 0:
+            f.WriteLn("Start => TbResetDone,")
+        else:
+            self._SupportLibStart(f, "TbStart")
+        if self.handshake == Handshake.BARRIER:
+            f.WriteLn("CaseDone => CaseDone,")
+        else:
+            f.WriteLn("ProcessDone => ProcessDone,")
+        f.WriteLn("NextCase => NextCase,")
+        f.WriteLn("Running => TbRunning")
+        f.DecIndent().WriteLn(");").DecIndent()
+        return f
+
     def _TbControl(self, f : FileWriter) -> FileWriter:
         VhdlTitle("Testbench Control !DO NOT EDIT!", f)
+        if self._UseSequencer():
+            self._TbSequencer(f)
+            if self.regression:
+                f.WriteLn()
+                f.WriteLn("TbDone <= not TbRunning;")
+            return f
         f.WriteLn("p_tb_control : process")
+        if self._HasTbControlProcedures():
+            f.IncIndent()
+            self._TbControlDeclarations(f).DecIndent()
         f.WriteLn("begin").IncIndent()
+        if self.tbInfo.timingReport is not None:
+            f.WriteLn("write(TbReportLine_v, string'(\"testbench,case,process,start,end\"));")
+            f.WriteLn("writeline(TbReport_f, TbReportLine_v);")
+        self._WaitTbStart(f)
         rsts = DutInfo.FilterForTag(self.dutInfo.ports, Tags.TYPE, "rst")
         if len(rsts) > 0:
             rstLogic = " and ".join([r.name + " = " + self.dutInfo.GetPortValue(r, False) for r in rsts])
             f.WriteLn("wait until {};".format(rstLogic))
-        if self.tbInfo.isMultiCaseTb:
+        if self.tbInfo.isMultiCaseTb and self.compact and not self._HasTbControlProcedures():
+            f.WriteLn("for CaseNr in 0 to {} loop".format(len(self.tbInfo.testCases)-1)).IncIndent()
+            f.WriteLn("NextCase <= CaseNr;")
+            f.WriteLn("wait until {};".format(self._CaseDoneCondition("CaseNr")))
+            f.DecIndent().WriteLn("end loop;")
+        elif self.tbInfo.isMultiCaseTb:
             for i, c in enumerate(self.tbInfo.testCases):
                 f.WriteLn("-- {}".format(c))
                 f.WriteLn("NextCase <= {};".format(i))
-                f.WriteLn("wait until ProcessDone = AllProcessesDone_c;")
+                self._TbWaitCase(f, c, i)
         else:
-            f.WriteLn("wait until ProcessDone = AllProcessesDone_c;")
+            self._TbWaitCase(f, "default", 0)
         #end of TB
         f.WriteLn("TbRunning <= false;")
         f.WriteLn("wait;")
         f.DecIndent().WriteLn("end process;")
+        if self.regression:
+            f.WriteLn()
+            f.WriteLn("TbDone <= not TbRunning;")
+        return f
+
+    def _WaitTbStart(self, f : FileWriter) -> FileWriter:
+        if self.regression:
+            f.WriteLn("if not TbStart then").IncIndent()
+            f.WriteLn("wait until TbStart;")
+            f.DecIndent().WriteLn("end if;")
+        return f
+
+    def _HasTbControlProcedures(self) -> bool:
+        return (self.tbInfo.timingReport is not None) or (self.tbInfo.caseTimeouts is not None)
+
+    def _TbWaitCase(self, f : FileWriter, case : str, caseNr : int) -> FileWriter:
+        if not self._HasTbControlProcedures():
+            f.WriteLn("wait until {};".format(self._CaseDoneCondition(str(caseNr))))
+            return f
+        args = ["\"{}\"".format(case)]
+        if self.handshake == Handshake.BARRIER:
+            args.append(str(caseNr))
+        if self.tbInfo.caseTimeouts is not None:
+            args.append(self.tbInfo.caseTimeouts[caseNr])
+        f.WriteLn("TbWaitCase({});".format(", ".join(args)))
         return f
 
     def _GenericConstants(self, f : FileWriter) -> FileWriter:
@@ -167,8 +434,32 @@ class TbGenerator:
         VhdlTitle("TB Control", f, 2)
         f.WriteLn("signal TbRunning : boolean := True;")
         f.WriteLn("signal NextCase : integer := -1;")
-        f.WriteLn("signal ProcessDone : std_logic_vector(0 to {}) := (others => '0');".format(len(self.tbInfo.tbProcesses)-1))
-        f.WriteLn("constant AllProcessesDone_c : std_logic_vector(0 to {}) := (others => '1');".format(len(self.tbInfo.tbProcesses)-1))
+        if self._UseSequencer() and len(DutInfo.FilterForTag(self.dutInfo.ports, Tags.TYPE, "rst")) > 0:
+            f.WriteLn("signal TbResetDone : boolean := false;")
+        if self.handshake == Handshake.BARRIER and self.supportLib is not None:
+            f.WriteLn("signal CaseDone : TbCaseDone_t := -1;")
+            if self.tbInfo.caseTimeouts is not None:
+                f.WriteLn("signal ProcessCase : TbCaseNr_a(0 to {}) := (others => -1);".format(len(self.tbInfo.tbProcesses)-1))
+        elif self.handshake == Handshake.BARRIER:
+            f.WriteLn("type TbCaseNr_a is array (natural range <>) of integer;")
+            f.WriteLn("function TbMinCase(CaseNrs : TbCaseNr_a) return integer is").IncIndent()
+            f.WriteLn("variable Min_v : integer := integer'high;").DecIndent()
+            f.WriteLn("begin").IncIndent()
+            f.WriteLn("for i in CaseNrs'range loop").IncIndent()
+            f.WriteLn("if CaseNrs(i) < Min_v then").IncIndent()
+            f.WriteLn("Min_v := CaseNrs(i);")
+            f.DecIndent().WriteLn("end if;")
+            f.DecIndent().WriteLn("end loop;")
+            f.WriteLn("return Min_v;")
+            f.DecIndent().WriteLn("end function;")
+            f.WriteLn("-- Last case completed by all processes (each process drives the last case it completed)")
+            f.WriteLn("signal CaseDone : TbMinCase integer := -1;")
+            if self.tbInfo.caseTimeouts is not None:
+                f.WriteLn("-- Last case completed by each process (only used for timeout diagnostics)")
+                f.WriteLn("signal ProcessCase : TbCaseNr_a(0 to {}) := (others => -1);".format(len(self.tbInfo.tbProcesses)-1))
+        else:
+            f.WriteLn("signal ProcessDone : std_logic_vector(0 to {}) := (others => '0');".format(len(self.tbInfo.tbProcesses)-1))
+            f.WriteLn("constant AllProcessesDone_c : std_logic_vector(0 to {}) := (others => '1');".format(len(self.tbInfo.tbProcesses)-1))
         for i, p in enumerate(self.tbInfo.tbProcesses):
             f.WriteLn("constant TbProcNr_{}_c : integer := {};".format(p, i))
         return f
@@ -208,6 +499,12 @@ class TbGenerator:
                 f.WriteLn(line)
             f.RemoveFromLastLine(1)
             f.DecIndent().WriteLn(");")
+        if self.regression:
+            f.WriteLn("port (").IncIndent()
+            f.WriteLn("TbStart : in boolean := true;")
+            f.WriteLn("TbDone : out boolean := false;")
+            f.WriteLn("TbTimedOut : out boolean := false")
+            f.DecIndent().WriteLn(");")
         f.DecIndent()
         f.WriteLn("end entity;").WriteLn()
         return f
@@ -230,9 +527,15 @@ class TbGenerator:
             self._Header(f).WriteLn()
             self.dutInfo.LibraryDeclarations(f)
             self.tbInfo.UserPkgDelcaration(f)
+            if self.tbInfo.timingReport is not None:
+                self.tbInfo.TextioDeclaration(f)
+            if self.supportLib is not None:
+                SupportLibDeclaration(f, self.supportLib)
             if self.tbInfo.isMultiCaseTb:
                 self.tbInfo.TbPkgDeclaration(f)
-                self.tbInfo.TbCaseDeclaration(f)
+                #Case procedures are called with their full name, the use clauses are only kept for compatibility
+                if not self.compact:
+                    self.tbInfo.TbCaseDeclaration(f)
 
             #Entity Declaration
             self._EntityDeclaration(f)
@@ -262,16 +565,41 @@ class TbGenerator:
 
 if __name__ == '__main__':
     parser = ArgumentParser()
-    parser.add_argument("-src", dest="src", help="VHDL source file", required=True)
+    parser.add_argument("-src", dest="src", help="VHDL source file(s)", nargs="+", required=True)
     parser.add_argument("-dst", dest="dst", help="TB destination directory", required=True)
     parser.add_argument("-clear", dest="clear", help="Clear destination directory before generating TB", required=False, default=False, action = "store_true")
     parser.add_argument("-mrg", dest="mrg", help="Create .mrg files intead of .vhd", required=False, default=False, action = "store_true")
     parser.add_argument("-force", dest="force", help="Force -clear without user confirmation", required=False, default = False, action="store_true")
+    parser.add_argument("-regression", dest="regression", help="Also create a regression top-level with this name that runs all TBs", required=False, default=None)
+    parser.add_argument("-compact", dest="compact", help="Dispatch test cases through a case statement (smaller multi-case TBs)", required=False, default=False, action="store_true")
+    parser.add_argument("-handshake", dest="handshake", help="Process completion handshake (default: vector)", choices=[Handshake.VECTOR, Handshake.BARRIER], required=False, default=Handshake.VECTOR)
+    parser.add_argument("-supportlib", dest="supportlib", help="Use clocks, resets and sequencer from the support library with this name instead of inlining them", required=False, default=None)
+    parser.add_argument("-supportdst", dest="supportdst", help="Write the support library sources to this directory (only if missing or outdated)", required=False, default=None)
+    parser.add_argument("-searchpath", dest="searchpath", help="Directories containing packages used by the DUTs (the directory of each DUT is always searched)", nargs="+", required=False, default=None)
+    parser.add_argument("-groupsize", dest="groupsize", help="Number of TBs the regression runs in parallel (default: 1)", type=int, required=False, default=1)
     args = parser.parse_args()
 
     #Check arguments
-    if not os.path.isfile(args.src):
-        print("ERROR: -src path {} is not a file", args.src)
+    for src in args.src:
+        if not os.path.isfile(src):
+            print("ERROR: -src path {} is not a file".format(src))
+            exit(-1)
+
+    #Read all sources first so tag errors are reported before the destination directory is touched
+    try:
+        tbGens = []
+        for src in args.src:
+            print("Read HDL {}".format(src))
+            tbGen = TbGenerator(regression=args.regression is not None, compact=args.compact, handshake=args.handshake, supportLib=args.supportlib)
+            tbGen.ReadHdl(src, searchPath=args.searchpath)
+            for w in tbGen.warnings:
+                print("WARNING: " + w)
+            tbGens.append(tbGen)
+        CheckTbNames([g.tbInfo for g in tbGens])
+        if args.regression is not None:
+            CheckRegression([g.tbInfo for g in tbGens], args.groupsize)
+    except Exception as e:
+        print("ERROR: " + str(e))
         exit(-1)
 
     #Clear directory if required
@@ -300,14 +628,20 @@ if __name__ == '__main__':
 
     #Generate TB
     try:
-        print("Read HDL")
-        tbGen = TbGenerator()
-        tbGen.ReadHdl(args.src)
-        print("Generate TB")
         extension = ".vhd"
         if args.mrg:
             extension = ".mrg"
-        tbGen.Generate(args.dst, extension, overwrite=args.mrg)
+        for tbGen in tbGens:
+            print("Generate TB {}".format(tbGen.tbInfo.tbName))
+            tbGen.Generate(args.dst, extension, overwrite=args.mrg)
+        if args.regression is not None:
+            print("Generate Regression {}".format(args.regression))
+            WriteRegressionTb(args.dst, args.regression, [g.tbInfo for g in tbGens], args.groupsize, extension, overwrite=args.mrg)
+        if args.supportdst is not None:
+            if WriteSupportLib(args.supportdst):
+                print("Generate Support Library in {}".format(args.supportdst))
+            else:
+                print("Support Library in {} is up to date".format(args.supportdst))
         print("Done")
     except Exception as e:
         print("ERROR: " + str(e))
@@ -74,6 +74,12 @@ class TbGenGui(QDialog):
             if not os.path.isdir(dst):
                 raise FileNotFoundError("Directory {} does not exist".format(src))
 
+            #Read and validate the source before the destination is touched
+            tbGen = TbGenerator()
+            tbGen.ReadHdl(src)
+            if len(tbGen.warnings) > 0:
+                QMessageBox.warning(self, "Warnings", "\n".join(tbGen.warnings))
+
             #Clear if required
             if self.clrCb.isChecked():
                 for file in os.listdir(dst):
@@ -82,8 +88,6 @@ class TbGenGui(QDialog):
                         os.remove(fp)
 
             #Generate
-            tbGen = TbGenerator()
-            tbGen.ReadHdl(src)
             overwrite = False
             if self.mrgCb.isChecked():
                 ext = ".mrg"
@@ -8,6 +8,10 @@ from DutInfo import DutInfo, Tags
 from typing import List
 from VhdlParse import VhdlPortDeclaration
 from PsiPyUtils import FileWriter
+import re
+
+#Timeout values are given as time (e.g. 10ms, 2.5 us) or as number of clock cycles (e.g. 1000)
+TIMEOUT_FORMAT = re.compile(r"^\s*([0-9]+(\.[0-9]+)?([eE][0-9]+)?)\s*(fs|ps|ns|us|ms|sec)?\s*$", re.IGNORECASE)
 
 class TbInfo:
 
@@ -42,8 +46,42 @@ class TbInfo:
             else:
                 self.tbUserPackages[lib].append(pkgName)
 
+        self.timingReport = None
+        if Tags.TIMINGREPORT in info.fileScopeTags:
+            timingReport = info.fileScopeTags[Tags.TIMINGREPORT]
+            if timingReport.lower() == "true":
+                self.timingReport = self.tbName + "_timing.csv"
+            elif timingReport.lower() != "false":
+                self.timingReport = timingReport
+
+        self.caseTimeouts = None
+        if Tags.TIMEOUT in info.fileScopeTags:
+            timeouts = info.fileScopeTags[Tags.TIMEOUT]
+            if type(timeouts) is str:
+                timeouts = [timeouts] * (len(self.testCases) if self.isMultiCaseTb else 1)
+            elif (not self.isMultiCaseTb) or (len(timeouts) != len(self.testCases)):
+                raise Exception("TIMEOUT tag must contain one value or one value per test case!")
+            timeoutClk = info.fileScopeTags.get(Tags.TIMEOUTCLK, None)
+            self.caseTimeouts = [self._TimeoutToVhdl(t, timeoutClk, info) for t in timeouts]
+
         self.dutInfo = info
 
+    @classmethod
+    def _TimeoutToVhdl(cls, value : str, clkName : str, info : DutInfo) -> str:
+        match = TIMEOUT_FORMAT.match(value)
+        if match is None:
+            raise Exception("Illegal TIMEOUT value '{}'!".format(value))
+        number, unit = match.group(1), match.group(4)
+        if unit is not None:
+            return "{} {}".format(number, unit.lower())
+        #Timeout in clock cycles
+        if clkName is None:
+            raise Exception("TIMEOUT value '{}' has no time unit and no TIMEOUTCLK tag is given!".format(value))
+        clks = [c for c in DutInfo.FilterForTag(info.ports, Tags.TYPE, "clk") if c.name.lower() == clkName.lower()]
+        if len(clks) == 0 or not DutInfo.HasTag(clks[0], Tags.FREQ):
+            raise Exception("TIMEOUTCLK {} is not a clock with FREQ tag!".format(clkName))
+        return "(1 sec)/real({})*{}".format(DutInfo.GetTag(clks[0], Tags.FREQ), int(float(number)))
+
     def GetPortsForProcess(self, process : str) -> List[VhdlPortDeclaration]:
         return DutInfo.FilterForTag(self.dutInfo.ports, Tags.PROC, process)
 
@@ -54,6 +92,12 @@ class TbInfo:
                 f.WriteLn("use {}.{}.all;".format(lib, pkg))
             f.DecIndent().WriteLn()
 
+    def TextioDeclaration(self, f : FileWriter) -> FileWriter:
+        f.WriteLn("library std;").IncIndent()
+        f.WriteLn("use std.textio.all;")
+        f.DecIndent().WriteLn()
+        return f
+
     def TbPkgDeclaration(self, f : FileWriter) -> FileWriter:
         f.WriteLn("library work;".format()).IncIndent()
         f.WriteLn("use work.{}_pkg.all;".format(self.tbName))
@@ -64,4 +108,11 @@ class TbInfo:
         for c in self.testCases:
             f.WriteLn("use work.{}_case_{}.all;".format(self.tbName, c))
         f.DecIndent().WriteLn()
-        return f
\ No newline at end of file
+        return f
+
+#TBs generated in one batch must have distinct names, otherwise their files collide
+def CheckTbNames(tbInfos : List[TbInfo]):
+    names = [tb.tbName.lower() for tb in tbInfos]
+    for tb in tbInfos:
+        if names.count(tb.tbName.lower()) > 1:
+            raise Exception("Testbench {} is generated more than once!".format(tb.tbName))
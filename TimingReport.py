@@ -0,0 +1,145 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+import os
+import sys
+if __name__ == "__main__":
+    myPath = os.path.realpath(os.path.dirname(__file__))
+    sys.path.append(myPath + "/..")
+
+import csv
+from typing import Iterable, List
+from argparse import ArgumentParser
+
+#Time units as written by VHDL textio, values in femtoseconds
+TIME_UNITS = {"fs" : 1, "ps" : 10**3, "ns" : 10**6, "us" : 10**9, "ms" : 10**12, "sec" : 10**15, "min" : 60*10**15, "hr" : 3600*10**15}
+
+#Process name used for the rows covering a complete test case
+CASE_ROW = "*"
+
+#Header line of a timing report, used to find reports written under a custom name (TIMINGREPORT=<file>)
+REPORT_HEADER = ["testbench", "case", "process", "start", "end"]
+
+def ParseTime(string : str) -> int:
+    parts = string.split()
+    if len(parts) != 2 or parts[1].lower() not in TIME_UNITS:
+        raise Exception("Illegal time value '{}'".format(string))
+    return int(round(float(parts[0]) * TIME_UNITS[parts[1].lower()]))
+
+def FormatTime(fs : int) -> str:
+    for unit in ["sec", "ms", "us", "ns", "ps"]:
+        if abs(fs) >= TIME_UNITS[unit]:
+            return "{:.3f} {}".format(fs / TIME_UNITS[unit], unit)
+    return "{} fs".format(fs)
+
+class TimingEntry:
+
+    def __init__(self, testbench : str, case : str, process : str, start : int, end : int):
+        self.testbench = testbench
+        self.case = case
+        self.process = process
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+class CaseStatistics:
+
+    def __init__(self, testbench : str, case : str):
+        self.testbench = testbench
+        self.case = case
+        self.durations = []
+        self.processDurations = {}
+
+    @property
+    def runs(self) -> int:
+        return len(self.durations)
+
+    @property
+    def total(self) -> int:
+        return sum(self.durations)
+
+    @property
+    def mean(self) -> int:
+        return self.total // self.runs
+
+    @property
+    def worst(self) -> int:
+        return max(self.durations)
+
+    @property
+    def slowestProcess(self) -> str:
+        if len(self.processDurations) == 0:
+            return None
+        return max(self.processDurations, key=lambda p: max(self.processDurations[p]))
+
+def IsTimingReport(filePath : str) -> bool:
+    try:
+        with open(filePath, "r", newline="") as f:
+            header = next(csv.reader(f), [])
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return False
+    return [h.strip().lower() for h in header] == REPORT_HEADER
+
+def ReadTimingReport(filePath : str) -> List[TimingEntry]:
+    if not os.path.isfile(filePath):
+        raise Exception("Timing report {} does not exist".format(filePath))
+    if not IsTimingReport(filePath):
+        raise Exception("{} is not a timing report (header must be {})".format(filePath, ",".join(REPORT_HEADER)))
+    entries = []
+    with open(filePath, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            entries.append(TimingEntry(row["testbench"], row["case"], row["process"], ParseTime(row["start"]), ParseTime(row["end"])))
+    return entries
+
+def FindTimingReports(paths : Iterable[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files += [os.path.join(root, n) for n in sorted(names) if n.lower().endswith(".csv") and IsTimingReport(os.path.join(root, n))]
+        else:
+            files.append(path)
+    return files
+
+def RankCases(entries : Iterable[TimingEntry]) -> List[CaseStatistics]:
+    stats = {}
+    for e in entries:
+        key = (e.testbench, e.case)
+        if key not in stats:
+            stats[key] = CaseStatistics(e.testbench, e.case)
+        if e.process == CASE_ROW:
+            stats[key].durations.append(e.duration)
+        else:
+            stats[key].processDurations.setdefault(e.process, []).append(e.duration)
+    #Cases of aborted runs have no case row and are not ranked
+    ranked = [s for s in stats.values() if s.runs > 0]
+    return sorted(ranked, key=lambda s: s.total, reverse=True)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument("-src", dest="src", help="Timing report files or directories to search for timing reports (*.csv files with a timing report header)", nargs="+", required=True)
+    parser.add_argument("-top", dest="top", help="Number of cases to list (default: all)", type=int, required=False, default=None)
+    args = parser.parse_args()
+
+    entries = []
+    try:
+        for file in FindTimingReports(args.src):
+            entries += ReadTimingReport(file)
+    except Exception as e:
+        print("ERROR: " + str(e))
+        exit(-1)
+    ranking = RankCases(entries)
+    if args.top is not None:
+        ranking = ranking[:args.top]
+
+    print("{:<40} {:<20} {:>5} {:>16} {:>16} {:>16}  {}".format("Testbench", "Case", "Runs", "Total", "Mean", "Worst", "Slowest Process"))
+    for s in ranking:
+        print("{:<40} {:<20} {:>5} {:>16} {:>16} {:>16}  {}".format(s.testbench, s.case, s.runs, FormatTime(s.total), FormatTime(s.mean),
+                                                                   FormatTime(s.worst), s.slowestProcess or "-"))
@@ -0,0 +1,241 @@
+##############################################################################
+#  Copyright (c) 2018 by Paul Scherrer Institute, Switzerland
+#  All rights reserved.
+#  Authors: Oliver Bruendler
+##############################################################################
+
+from VhdlParse import VhdlPackageFile, VhdlType, VhdlRange, VhdlRangeFromTo, VhdlSubtypeDeclaration, VhdlArrayTypeDeclaration, \
+                      VhdlRecordTypeDeclaration, VhdlEnumTypeDeclaration, VhdlRangeTypeDeclaration
+from typing import Iterable, List, Tuple, Union
+import os
+import re
+
+class UnknownVhdlType(Exception): pass
+
+#Libraries that are never searched on disk, their types are known from the builtin table
+STANDARD_LIBRARIES = ["ieee", "std"]
+
+#File extensions searched for packages
+VHDL_EXTENSIONS = [".vhd", ".vhdl"]
+
+#Maximum nesting of packages using types of other packages
+MAX_DEPTH = 16
+
+class TypeKind:
+    LOGIC = "logic"                 #std_logic and compatible scalars
+    LOGIC_VECTOR = "logic_vector"   #arrays of LOGIC (std_logic_vector, unsigned, signed, ...)
+    BOOLEAN = "boolean"
+    INTEGER = "integer"
+    REAL = "real"
+    ENUM = "enum"
+    RECORD = "record"
+    ARRAY = "array"                 #arrays of anything else
+    OTHER = "other"                 #known but not further resolved (e.g. time, string)
+
+class ResolvedType:
+
+    def __init__(self, name : str, kind : str, range : Union[VhdlRange, VhdlRangeFromTo] = None, element : "ResolvedType" = None,
+                 fields : List[Tuple[str, "ResolvedType"]] = None, literals : List[str] = None):
+        self.name = name
+        self.kind = kind
+        self.range = range
+        self.element = element
+        self.fields = fields if fields is not None else []
+        self.literals = literals if literals is not None else []
+
+    def Constrain(self, name : str, range : Union[VhdlRange, VhdlRangeFromTo]) -> "ResolvedType":
+        if range is None:
+            range = self.range
+        return ResolvedType(name, self.kind, range, self.element, self.fields, self.literals)
+
+    #Left and right bound as string, None if the type is not constrained
+    @property
+    def bounds(self) -> Tuple[str, str]:
+        if self.range is None:
+            return None
+        return str(self.range.left[0]).strip(), str(self.range.right[0]).strip()
+
+    #Number of bits as int if the bounds are literals, as VHDL expression otherwise and None for unconstrained types
+    @property
+    def width(self) -> Union[int, str]:
+        if self.kind == TypeKind.LOGIC:
+            return 1
+        if self.kind in [TypeKind.LOGIC_VECTOR, TypeKind.ARRAY]:
+            if self.bounds is None:
+                return None
+            elementWidth = self.element.width if self.kind == TypeKind.ARRAY else 1
+            if elementWidth is None:
+                return None
+            left, right = self.bounds
+            try:
+                length = abs(int(left) - int(right)) + 1
+            except ValueError:
+                high, low = (left, right) if self.range.direction.lower() == "downto" else (right, left)
+                return "({})-({})+1".format(high, low) if elementWidth == 1 else "(({})-({})+1)*({})".format(high, low, elementWidth)
+            if type(elementWidth) is int:
+                return length * elementWidth
+            return "{}*({})".format(length, elementWidth)
+        if self.kind == TypeKind.RECORD:
+            widths = [t.width for n, t in self.fields]
+            if None in widths:
+                return None
+            if all(type(w) is int for w in widths):
+                return sum(widths)
+            return "+".join(str(w) for w in widths)
+        return None
+
+    #Value of a signal of this type with all logic bits set to logicVal, other scalars get their leftmost value.
+    #Raises UnknownVhdlType if no legal value can be given (the signal then keeps its VHDL default).
+    def Value(self, logicVal : str) -> str:
+        if self.kind == TypeKind.LOGIC:
+            return logicVal
+        if self.kind == TypeKind.LOGIC_VECTOR:
+            return "(others => {})".format(logicVal)
+        if self.kind == TypeKind.ARRAY:
+            return "(others => {})".format(self.element.Value(logicVal))
+        if self.kind == TypeKind.RECORD:
+            return "(" + ", ".join("{} => {}".format(n, t.Value(logicVal)) for n, t in self.fields) + ")"
+        #Range constraint of a scalar (e.g. integer range 0 to 3), the left bound is the leftmost value
+        if isinstance(self.range, VhdlRangeFromTo):
+            return self.bounds[0]
+        #Index constraint on a type that is not resolved as array (element type unknown)
+        if self.range is not None:
+            raise UnknownVhdlType("No initial value for VHDL Type {}".format(self.name))
+        if self.kind == TypeKind.ENUM and len(self.literals) > 0:
+            return self.literals[0]
+        return "{}'left".format(self.name)
+
+_LOGIC = ResolvedType("std_logic", TypeKind.LOGIC)
+
+#Types of the standard libraries by lower case name
+BUILTIN_TYPES = {}
+for n in ["std_logic", "std_ulogic", "bit"]:
+    BUILTIN_TYPES[n] = ResolvedType(n, TypeKind.LOGIC)
+for n in ["std_logic_vector", "std_ulogic_vector", "bit_vector", "unsigned", "signed"]:
+    BUILTIN_TYPES[n] = ResolvedType(n, TypeKind.LOGIC_VECTOR, element=_LOGIC)
+for n in ["integer", "natural", "positive"]:
+    BUILTIN_TYPES[n] = ResolvedType(n, TypeKind.INTEGER)
+for n in ["time", "delay_length", "character", "severity_level"]:
+    BUILTIN_TYPES[n] = ResolvedType(n, TypeKind.OTHER)
+BUILTIN_TYPES["string"] = ResolvedType("string", TypeKind.ARRAY, element=BUILTIN_TYPES["character"])
+BUILTIN_TYPES["boolean"] = ResolvedType("boolean", TypeKind.BOOLEAN, literals=["false", "true"])
+BUILTIN_TYPES["real"] = ResolvedType("real", TypeKind.REAL)
+
+
+##############################################################################
+# Process-wide cache
+##############################################################################
+#Parsed package files and the package names found in each file are kept for the whole process so common packages
+#are only parsed once per batch. Entries are keyed by the real path and invalidated if size or modification time change.
+
+_packageFiles = {}  # path -> (stamp, VhdlPackageFile)
+_packageNames = {}  # path -> (stamp, [lower case package names])
+_dirListings = {}   # directory -> (stamp, [file paths])
+
+PACKAGE_DECLARATION = re.compile(r"^\s*package\s+(?!body\b)(\w+)\s+is\b", re.IGNORECASE | re.MULTILINE)
+
+def _Stamp(path : str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def ClearTypeCache():
+    _packageFiles.clear()
+    _packageNames.clear()
+    _dirListings.clear()
+
+def GetPackageFile(path : str) -> VhdlPackageFile:
+    path = os.path.realpath(path)
+    stamp = _Stamp(path)
+    if path not in _packageFiles or _packageFiles[path][0] != stamp:
+        _packageFiles[path] = (stamp, VhdlPackageFile(path))
+    return _packageFiles[path][1]
+
+def _PackagesInFile(path : str) -> List[str]:
+    stamp = _Stamp(path)
+    if path not in _packageNames or _packageNames[path][0] != stamp:
+        #Unreadable files cannot contain a usable package and must not prevent finding packages in other files
+        try:
+            with open(path, "rb") as f:
+                code = f.read().decode("latin-1")
+        except OSError:
+            code = ""
+        _packageNames[path] = (stamp, [m.group(1).lower() for m in PACKAGE_DECLARATION.finditer(code)])
+    return _packageNames[path][1]
+
+def _VhdlFilesInDir(directory : str) -> List[str]:
+    stamp = _Stamp(directory)
+    if directory not in _dirListings or _dirListings[directory][0] != stamp:
+        files = [os.path.join(directory, n) for n in sorted(os.listdir(directory))
+                 if os.path.splitext(n)[1].lower() in VHDL_EXTENSIONS]
+        _dirListings[directory] = (stamp, files)
+    return _dirListings[directory][1]
+
+def FindPackage(name : str, searchPath : Iterable[str]) -> VhdlPackageFile:
+    name = name.lower()
+    for directory in searchPath:
+        directory = os.path.realpath(directory)
+        if not os.path.isdir(directory):
+            continue
+        #Files named after the package are checked first, this avoids reading all files in most cases
+        files = _VhdlFilesInDir(directory)
+        likely = [p for p in files if os.path.splitext(os.path.basename(p))[0].lower() == name]
+        for path in likely + [p for p in files if p not in likely]:
+            if name in _PackagesInFile(path):
+                return GetPackageFile(path)
+    return None
+
+
+##############################################################################
+# Resolver
+##############################################################################
+class TypeResolver:
+
+    def __init__(self, searchPath : Iterable[str] = None):
+        self.searchPath = list(searchPath) if searchPath is not None else []
+
+    #Packages visible through the use statements given, standard libraries are skipped
+    @classmethod
+    def UsedPackages(cls, usestatements : Iterable) -> List[str]:
+        return [u.element for u in usestatements if u.library.lower() not in STANDARD_LIBRARIES]
+
+    def Resolve(self, vhdlType : VhdlType, packages : List[str]) -> ResolvedType:
+        return self._ResolveType(vhdlType, packages, 0)
+
+    def _ResolveType(self, vhdlType : VhdlType, packages : List[str], depth : int) -> ResolvedType:
+        base = self._ResolveName(vhdlType.name, packages, depth)
+        range = vhdlType.range if vhdlType.range is not None else vhdlType.rangeConstraint
+        if range is None:
+            return base
+        return base.Constrain(str(vhdlType), range)
+
+    def _ResolveName(self, name : str, packages : List[str], depth : int) -> ResolvedType:
+        if depth > MAX_DEPTH:
+            raise UnknownVhdlType("Type {} is nested too deeply (circular package references?)".format(name))
+        if name.lower() in BUILTIN_TYPES:
+            return BUILTIN_TYPES[name.lower()]
+        for pkgName in packages:
+            pkgFile = FindPackage(pkgName, self.searchPath)
+            if pkgFile is None:
+                continue
+            decl = pkgFile.types.get(name.lower())
+            if decl is not None:
+                #Types inside the package may use the package itself and all packages it uses
+                innerPackages = pkgFile.packages + self.UsedPackages(pkgFile.usestatements)
+                return self._ResolveDeclaration(decl, innerPackages, depth + 1)
+        raise UnknownVhdlType("Unknown VHDL Type {}".format(name))
+
+    def _ResolveDeclaration(self, decl, packages : List[str], depth : int) -> ResolvedType:
+        if type(decl) is VhdlSubtypeDeclaration:
+            return self._ResolveType(decl.type, packages, depth).Constrain(decl.name, None)
+        if type(decl) is VhdlArrayTypeDeclaration:
+            element = self._ResolveType(decl.element, packages, depth)
+            kind = TypeKind.LOGIC_VECTOR if element.kind == TypeKind.LOGIC else TypeKind.ARRAY
+            return ResolvedType(decl.name, kind, decl.range, element=element)
+        if type(decl) is VhdlRecordTypeDeclaration:
+            fields = [(n, self._ResolveType(t, packages, depth)) for n, t in decl.fields]
+            return ResolvedType(decl.name, TypeKind.RECORD, fields=fields)
+        if type(decl) is VhdlEnumTypeDeclaration:
+            return ResolvedType(decl.name, TypeKind.ENUM, literals=decl.literals)
+        if type(decl) is VhdlRangeTypeDeclaration:
+            return ResolvedType(decl.name, TypeKind.INTEGER, decl.range)
+        raise UnknownVhdlType("Unsupported declaration of type {}".format(decl.name))
@@ -5,7 +5,9 @@
 ##############################################################################
 
 import pyparsing as pp
-from typing import Tuple, List
+import re
+import os
+from typing import Tuple, List, Union, IO
 
 kw = ["to", "downto", "entity", "port", "generic", "end", "is"]
 PP_KEYWORDS = pp.MatchFirst(kw)
@@ -49,6 +51,7 @@ class VhdlConstruct:
             code = PrToStr(code)
         code = code.strip()
         self.code = code
+        self.lineNr = None
         try:
             self._Parse(self.PP_DEFINITION.parseString(code))
         except:
@@ -72,7 +75,9 @@ class VhdlCommentLine(VhdlConstruct):
         self.comment = parts[0].get("text")
 
 class VhdlUseStatement(VhdlConstruct):
-    PP_DEFINITION = pp.LineStart().leaveWhitespace() + pp.Literal("use") + PP_IDENTIFIER("library") + pp.Literal(".") + PP_IDENTIFIER("element") + pp.Literal(".") + PP_IDENTIFIER("object")
+    # use clauses may be indented but must not be preceded by anything else on the line (e.g. a comment)
+    PP_USE = pp.CaselessKeyword("use").addCondition(lambda s, l, t: s[:l].rsplit("\n", 1)[-1].strip() == "")
+    PP_DEFINITION = PP_USE + PP_IDENTIFIER("library") + pp.Literal(".") + PP_IDENTIFIER("element") + pp.Literal(".") + PP_IDENTIFIER("object")
 
     def _Parse(self, parts : pp.ParseResults):
         self.library = parts.get("library")
@@ -104,7 +109,7 @@ class VhdlRangeFromTo(VhdlConstruct):
         self.direction = str(parts.get("dir")).lower()
 
 class VhdlType(VhdlConstruct):
-    PP_DEFINITION = PP_IDENTIFIER("vhdlType") + pp.Optional(VhdlRange.PP()("range")) + pp.Optional(VhdlRangeFromTo.PP())
+    PP_DEFINITION = PP_IDENTIFIER("vhdlType") + pp.Optional(VhdlRange.PP()("range")) + pp.Optional(VhdlRangeFromTo.PP()("rangeConstraint"))
 
     def _Parse(self, parts : pp.ParseResults):
         self.name = parts.get("vhdlType")
@@ -113,12 +118,25 @@ class VhdlType(VhdlConstruct):
             self.range = VhdlRange(range)
         else:
             self.range = None
+        rangeConstraint = parts.get("rangeConstraint")
+        if rangeConstraint is not None:
+            self.rangeConstraint = VhdlRangeFromTo(rangeConstraint)
+        else:
+            self.rangeConstraint = None
 
     def __str__(self):
+        string = self.name
         if self.range is not None:
-            return self.name + str(self.range)
-        else:
-            return self.name
+            string += str(self.range)
+        if self.rangeConstraint is not None:
+            string += " " + str(self.rangeConstraint)
+        return string
+
+    # Type for subprogram parameters, index constraints are dropped so arrays of any size can be passed
+    def ParameterType(self) -> str:
+        if self.rangeConstraint is not None:
+            return self.name + " " + str(self.rangeConstraint)
+        return self.name
 
 class VhdlGenericDeclaration(VhdlConstruct):
     PP_DEFINITION = PP_IDENTIFIER("name") + ":" + VhdlType.PP()("type") + pp.Optional(":=" + PP_EXPRESSION("default")) + pp.Optional(";") + pp.Optional(PP_COMMENT("comment"))
@@ -165,21 +183,132 @@ class VhdlEntityDeclaration(VhdlConstruct):
             self.ports = []
 
 
+class VhdlSubtypeDeclaration(VhdlConstruct):
+    PP_DEFINITION = pp.CaselessKeyword("subtype") + PP_IDENTIFIER("name") + pp.CaselessKeyword("is") + \
+                    pp.Optional(PP_IDENTIFIER("resolution") + pp.FollowedBy(~pp.CaselessKeyword("range") + PP_IDENTIFIER)) + \
+                    VhdlType.PP()("type") + ";"
+
+    def _Parse(self, parts : pp.ParseResults):
+        self.name = parts.get("name")
+        self.type = VhdlType(parts.get("type"))
+
+class VhdlArrayTypeDeclaration(VhdlConstruct):
+    PP_UNCONSTRAINED = pp.Literal("(") + PP_IDENTIFIER + pp.CaselessKeyword("range") + pp.Literal("<>") + pp.Literal(")")
+    PP_DEFINITION = pp.CaselessKeyword("type") + PP_IDENTIFIER("name") + pp.CaselessKeyword("is") + pp.CaselessKeyword("array") + \
+                    (VhdlRange.PP()("range") | PP_UNCONSTRAINED) + pp.CaselessKeyword("of") + VhdlType.PP()("element") + ";"
+
+    def _Parse(self, parts : pp.ParseResults):
+        self.name = parts.get("name")
+        range = parts.get("range")
+        if range is not None:
+            self.range = VhdlRange(range)
+        else:
+            self.range = None
+        self.element = VhdlType(parts.get("element"))
+
+class VhdlRecordTypeDeclaration(VhdlConstruct):
+    PP_FIELD = pp.Group(pp.delimitedList(PP_IDENTIFIER)("names") + ":" + VhdlType.PP()("type") + ";")
+    PP_DEFINITION = pp.CaselessKeyword("type") + PP_IDENTIFIER("name") + pp.CaselessKeyword("is") + pp.CaselessKeyword("record") + \
+                    pp.OneOrMore(PP_FIELD)("fields") + pp.CaselessKeyword("end") + pp.CaselessKeyword("record") + pp.Optional(PP_IDENTIFIER) + ";"
+
+    def _Parse(self, parts : pp.ParseResults):
+        self.name = parts.get("name")
+        self.fields = []
+        for f in parts.get("fields"):
+            fieldType = VhdlType(f.get("type"))
+            self.fields += [(n, fieldType) for n in f.get("names")]
+
+class VhdlEnumTypeDeclaration(VhdlConstruct):
+    PP_LITERAL = PP_IDENTIFIER | pp.Regex(r"'.'")
+    PP_DEFINITION = pp.CaselessKeyword("type") + PP_IDENTIFIER("name") + pp.CaselessKeyword("is") + \
+                    "(" + pp.delimitedList(PP_LITERAL)("literals") + ")" + ";"
+
+    def _Parse(self, parts : pp.ParseResults):
+        self.name = parts.get("name")
+        self.literals = list(parts.get("literals"))
+
+class VhdlRangeTypeDeclaration(VhdlConstruct):
+    PP_DEFINITION = pp.CaselessKeyword("type") + PP_IDENTIFIER("name") + pp.CaselessKeyword("is") + VhdlRangeFromTo.PP()("range") + ";"
+
+    def _Parse(self, parts : pp.ParseResults):
+        self.name = parts.get("name")
+        self.range = VhdlRangeFromTo(parts.get("range"))
+
+def _Decode(code : bytes) -> str:
+    try:
+        return code.decode("utf-8")
+    except UnicodeDecodeError:
+        return code.decode("latin-1")
+
+# VHDL code held in memory, a plain str is always treated as file path
+class VhdlSource:
+
+    def __init__(self, code : Union[str, bytes], name : str = "<string>"):
+        self.code = code
+        self.name = name
+
+    @classmethod
+    def FromText(cls, code : Union[str, bytes], name : str = "<string>") -> "VhdlSource":
+        return cls(code, name)
+
+# Sources can be given as file path (str or PathLike), VhdlSource, VHDL code as bytes or file-like object
+def ReadVhdlSource(source : Union[str, bytes, os.PathLike, IO, VhdlSource], sourceName : str = None) -> Tuple[str, str]:
+    if isinstance(source, VhdlSource):
+        code = source.code
+        name = source.name
+    elif hasattr(source, "read"):
+        code = source.read()
+        name = getattr(source, "name", "<stream>")
+    elif isinstance(source, (bytes, bytearray)):
+        code = bytes(source)
+        name = "<bytes>"
+    else:
+        with open(source, "rb") as f:
+            code = f.read()
+        name = str(source)
+    if isinstance(code, bytes):
+        code = _Decode(code).replace("\r\n", "\n")
+    if sourceName is not None:
+        name = sourceName
+    return code, name
+
+# Path of the file a source is read from (independent of the name used in diagnostics), None for in-memory sources
+def VhdlSourcePath(source : Union[str, bytes, os.PathLike, IO, VhdlSource]) -> str:
+    if isinstance(source, (str, os.PathLike)):
+        path = source
+    else:
+        path = getattr(source, "name", None)
+    if isinstance(path, (str, os.PathLike)) and os.path.isfile(path):
+        return os.path.realpath(path)
+    return None
+
 class VhdlFile:
 
-    def __init__(self, fileName : str):
+    def __init__(self, source : Union[str, bytes, os.PathLike, IO, VhdlSource], sourceName : str = None):
         # Read File
-        with open(fileName, "r") as f:
-            code = f.read()
+        code, self.fileName = ReadVhdlSource(source, sourceName)
+        self.filePath = VhdlSourcePath(source)
         code = code.replace("\t", " ")
 
         # Parse Entity Declaration
         for t, s, e in VhdlEntityDeclaration.PP().scanString(code):
             self.entity = VhdlEntityDeclaration(code[s:e])
+            self.entity.lineNr = pp.lineno(s, code)
             break
         else:
             raise Exception("Syntax error in VHDL Code!")
 
+        # Find line numbers of generics and ports (declarations are in order of appearance)
+        lines = code.splitlines()
+        lineIdx = self.entity.lineNr - 1
+        for decl in self.entity.generics + self.entity.ports:
+            pattern = re.compile(r"(^|[\s(;]){}\s*:".format(re.escape(decl.name)), re.IGNORECASE)
+            for i in range(lineIdx, len(lines)):
+                if pattern.search(lines[i].split("--")[0]):
+                    decl.lineNr = i + 1
+                    lineIdx = i
+                    break
+
         # Parse Library Definitions
         self.usestatements = []
         for t, s, e in VhdlUseStatement.PP().scanString(code):
@@ -188,10 +317,32 @@ class VhdlFile:
         # Parse comment Lines
         self.commentLines = []
         for t,s,e in VhdlCommentLine.PP().scanString(code):
-            self.commentLines.append(VhdlCommentLine(code[s:e]))
+            commentLine = VhdlCommentLine(code[s:e])
+            commentLine.lineNr = pp.lineno(s, code)
+            self.commentLines.append(commentLine)
 
 
+class VhdlPackageFile:
 
+    TYPE_DECLARATIONS = [VhdlSubtypeDeclaration, VhdlArrayTypeDeclaration, VhdlRecordTypeDeclaration, VhdlEnumTypeDeclaration, VhdlRangeTypeDeclaration]
 
+    def __init__(self, source : Union[str, bytes, os.PathLike, IO, VhdlSource], sourceName : str = None):
+        # Read File
+        code, self.fileName = ReadVhdlSource(source, sourceName)
+        self.filePath = VhdlSourcePath(source)
+        code = re.sub(r"--[^\n]*", "", code.replace("\t", " "))
 
+        # Packages declared in the file
+        self.packages = [m.group(1) for m in re.finditer(r"\bpackage\s+(?!body\b)(\w+)\s+is\b", code, re.IGNORECASE)]
+
+        # Parse Library Definitions
+        self.usestatements = []
+        for t, s, e in VhdlUseStatement.PP().scanString(code):
+            self.usestatements.append(VhdlUseStatement(code[s:e]))
 
+        # Parse type and subtype declarations (by lower case name)
+        self.types = {}
+        for declType in self.TYPE_DECLARATIONS:
+            for t, s, e in declType.PP().scanString(code):
+                decl = declType(code[s:e])
+                self.types[decl.name.lower()] = decl